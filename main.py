@@ -7,99 +7,631 @@ A simple script to translate SRT files from English to Myanmar
 import os
 import re
 import json
+import hashlib
+import mmap
 import time
+import atexit
+import random
+import asyncio
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import compress
+from dataclasses import dataclass, field
 from pathlib import Path
-from googletrans import Translator
+from threading import Semaphore
+from xml.etree import ElementTree
+import lmdb
+from tqdm import tqdm
+from prompt_toolkit import PromptSession
+from prompt_toolkit.key_binding import KeyBindings
+
+# Without httpx/aiolimiter translation falls back to urllib in a thread pool
+try:
+    import httpx
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    httpx = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TRANSLATE_URL = 'https://translate.googleapis.com/translate_a/t'
+REQUEST_TIMEOUT = 10.0
+TRANSLATION_ERROR_PREFIX = '[Translation Error: '
+MAX_CONCURRENT_REQUESTS = 8
+MAX_CONNECTIONS = 16
+REQUESTS_PER_SECOND = 5
+MAX_RETRIES = 5
+MAX_RETRY_DELAY = 60
+BATCH_SIZE = 50
+EXPORT_CHUNK_SIZE = 1024
+WRITE_BUFFER_SIZE = 1 << 20
+MEMORY_DB = Path('translation_memory.lmdb')
+MEMORY_MAP_SIZE = 2 << 30
+# Earlier memory formats, imported once and renamed to *.migrated
+LEGACY_MEMORY_LOG = Path('translation_memory.jsonl')
+LEGACY_MEMORY_FILE = Path('translation_memory.json')
+SOURCE_LANG = 'en'
+TARGET_LANG = 'my'
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+# The endpoint accepts repeated q parameters, one per segment; client=gtx
+# needs no request token
+TRANSLATE_PARAMS = {'client': 'gtx', 'sl': SOURCE_LANG, 'tl': TARGET_LANG, 'dt': 't',
+                    'ie': 'UTF-8', 'oe': 'UTF-8'}
+
+# Punctuation ignored when matching near-duplicate lines in memory
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+REVIEW_OPTIONS = '''
+Options:
+1. ✅ Accept and continue
+2. ✏️  Edit translation
+3. ⏭️  Skip to next
+4. ⏮️  Go back
+5. 🏁 Finish review'''
+
+# Blank lines between SRT blocks, with either line ending
+BLOCK_SEPARATOR_RE = re.compile(rb'\r?\n(?:[ \t]*\r?\n)+')
+
+def _needs_translation(text):
+    """Check whether a subtitle text has words worth sending to the translator"""
+    text = text.strip()
+    if len(text) < 2 or text.isdigit() or '-->' in text:
+        return False
+    # Music notes, dashes, ellipses and the like stay as they are
+    return any(c.isalpha() for c in text)
+
+def _review_key_bindings():
+    """Key bindings that pick a review option with a single keystroke"""
+    bindings = KeyBindings()
+    
+    def choose(event):
+        event.app.exit(result=event.data)
+    
+    for key in '12345':
+        bindings.add(key)(choose)
+    return bindings
+
+def _srt_block(subtitle_id, timing, text):
+    """Format one SRT block, including its trailing blank line"""
+    return f"{subtitle_id}\n{timing}\n{text}\n\n"
+
+def _source_digest(subtitles):
+    """Fingerprint of the parsed source a partial export belongs to"""
+    digest = hashlib.sha256()
+    for subtitle_id, timing, text in zip(subtitles.ids, subtitles.timings, subtitles.originals):
+        digest.update(f"{subtitle_id}\0{timing}\0{text}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+def _parse_translations(content, texts):
+    """Pull one translation per input text out of a raw batch response body"""
+    data = _loads(content)
+    # A single segment comes back as a bare value instead of a list
+    if len(texts) == 1:
+        data = [data]
+    results = [item[0] if isinstance(item, list) and item else item for item in data]
+    if len(results) != len(texts):
+        raise ValueError(f"expected {len(texts)} translations, got {len(results)}")
+    if not all(isinstance(result, str) for result in results):
+        raise ValueError("response contains a segment that is not text")
+    return results
+
+def _normalize(text):
+    """Memory key that ignores punctuation and case"""
+    return PUNCTUATION_RE.sub('', text).lower().strip()
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before retrying a rate-limited request"""
+    retry_after = response.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        delay = int(retry_after)
+    else:
+        delay = 2 ** attempt + random.random()
+    # Never stall a request slot for longer than a minute
+    return min(MAX_RETRY_DELAY, delay)
+
+@contextmanager
+def _atomic_open(path, mode='w', **kwargs):
+    """Open a temporary file that replaces path only once writing succeeds"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, mode, buffering=WRITE_BUFFER_SIZE, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+def _loads(data):
+    """Deserialize JSON from bytes"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+@dataclass(slots=True)
+class SubtitleStore:
+    """Parsed subtitles kept as parallel lists, one entry per SRT block"""
+    ids: list[int] = field(default_factory=list)
+    timings: list[str] = field(default_factory=list)
+    originals: list[str] = field(default_factory=list)
+    translations: list[str] = field(default_factory=list)
+    needs_review: list[bool] = field(default_factory=list)
+    # _needs_translation of each original, decided once at parse time
+    translatable: list[bool] = field(default_factory=list)
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def append(self, subtitle_id, timing, original_text):
+        """Add an untranslated subtitle"""
+        self.ids.append(subtitle_id)
+        self.timings.append(timing)
+        self.originals.append(original_text)
+        self.translations.append('')
+        self.needs_review.append(False)
+        self.translatable.append(_needs_translation(original_text))
+
+class TranslationMemory:
+    """Source to translation mapping stored in an LMDB environment
+    
+    Every entry is also indexed under its normalized key so lines that only
+    differ in punctuation or case can reuse a translation.
+    """
+    
+    def __init__(self, path, map_size=MEMORY_MAP_SIZE):
+        self._env = lmdb.open(str(path), map_size=map_size, max_dbs=2)
+        self._exact = self._env.open_db(b'exact')
+        self._norm = self._env.open_db(b'norm')
+        self._max_key_size = self._env.max_key_size()
+    
+    def __contains__(self, src):
+        return self.get(src) is not None
+    
+    def __getitem__(self, src):
+        tgt = self.get(src)
+        if tgt is None:
+            raise KeyError(src)
+        return tgt
+    
+    def __setitem__(self, src, tgt):
+        self.update([(src, tgt)])
+    
+    def __len__(self):
+        with self._env.begin() as txn:
+            return txn.stat(self._exact)['entries']
+    
+    def get(self, src, default=None):
+        """Exact-match lookup"""
+        key = src.encode('utf-8')
+        if len(key) > self._max_key_size:
+            return default
+        with self._env.begin() as txn:
+            value = txn.get(key, db=self._exact)
+        return default if value is None else value.decode('utf-8')
+    
+    def lookup(self, src):
+        """Find a translation, falling back to a punctuation/case-insensitive match"""
+        key = src.encode('utf-8')
+        norm_key = _normalize(src).encode('utf-8')
+        with self._env.begin() as txn:
+            value = None
+            if len(key) <= self._max_key_size:
+                value = txn.get(key, db=self._exact)
+            if value is None and norm_key and len(norm_key) <= self._max_key_size:
+                value = txn.get(norm_key, db=self._norm)
+        return None if value is None else value.decode('utf-8')
+    
+    def update(self, entries):
+        """Store several translations in one transaction"""
+        with self._env.begin(write=True) as txn:
+            for src, tgt in entries:
+                key = src.encode('utf-8')
+                # Lines longer than LMDB's key limit are simply not remembered
+                if len(key) > self._max_key_size:
+                    continue
+                value = tgt.encode('utf-8')
+                txn.put(key, value, db=self._exact)
+                norm_key = _normalize(src).encode('utf-8')
+                if norm_key and len(norm_key) <= self._max_key_size:
+                    txn.put(norm_key, value, db=self._norm)
+    
+    def items(self):
+        """Iterate over (source, translation) pairs"""
+        with self._env.begin() as txn:
+            for key, value in txn.cursor(db=self._exact):
+                yield key.decode('utf-8'), value.decode('utf-8')
+    
+    def clear(self):
+        """Forget all translations"""
+        with self._env.begin(write=True) as txn:
+            txn.drop(self._exact, delete=False)
+            txn.drop(self._norm, delete=False)
+    
+    def close(self):
+        self._env.close()
+    
+    def export_tmx(self, path):
+        """Write all entries to a TMX 1.4 file"""
+        header = ElementTree.Element('header', {
+            'creationtool': 'Myanmar Subtitle Translator',
+            'creationtoolversion': '1.0',
+            'segtype': 'sentence',
+            'o-tmf': 'lmdb',
+            'adminlang': SOURCE_LANG,
+            'srclang': SOURCE_LANG,
+            'datatype': 'plaintext',
+        })
+        with _atomic_open(path, encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<tmx version="1.4">\n')
+            f.write(f"  {ElementTree.tostring(header, encoding='unicode')}\n  <body>\n")
+            for src, tgt in self.items():
+                tu = ElementTree.Element('tu')
+                for lang, text in ((SOURCE_LANG, src), (TARGET_LANG, tgt)):
+                    tuv = ElementTree.SubElement(tu, 'tuv', {XML_LANG: lang})
+                    ElementTree.SubElement(tuv, 'seg').text = text
+                f.write(f"    {ElementTree.tostring(tu, encoding='unicode')}\n")
+            f.write('  </body>\n</tmx>\n')
+    
+    def import_tmx(self, path):
+        """Add the English/Myanmar pairs of a TMX file, returning how many were read"""
+        count = 0
+        entries = []
+        for _, elem in ElementTree.iterparse(path):
+            if elem.tag != 'tu':
+                continue
+            segs = {}
+            for tuv in elem.iter('tuv'):
+                lang = (tuv.get(XML_LANG) or tuv.get('lang') or '').lower()
+                seg = tuv.find('seg')
+                if seg is not None:
+                    segs[lang.split('-')[0]] = ''.join(seg.itertext())
+            elem.clear()
+            
+            if SOURCE_LANG in segs and TARGET_LANG in segs:
+                entries.append((segs[SOURCE_LANG], segs[TARGET_LANG]))
+                if len(entries) == EXPORT_CHUNK_SIZE:
+                    self.update(entries)
+                    count += len(entries)
+                    entries = []
+        self.update(entries)
+        return count + len(entries)
+
+class _PartialExport:
+    """Incremental copy of an export that survives an interrupted translation
+    
+    Finished blocks are appended to <output>.partial in subtitle order, and
+    <output>.offset records how many of them are safely on disk together with
+    the digest of the source they were translated from.
+    """
+    
+    def __init__(self, output_path, source_digest):
+        self._offset_path = f"{output_path}.offset"
+        self._source_digest = source_digest
+        # Drop the old offset first so it never describes the new, empty partial
+        if os.path.exists(self._offset_path):
+            os.unlink(self._offset_path)
+        self._file = open(f"{output_path}.partial", 'w', encoding='utf-8', newline='\n',
+                          buffering=WRITE_BUFFER_SIZE)
+    
+    def write(self, subtitles, start, end):
+        """Append subtitles[start:end] and move the offset past them"""
+        self._file.write(''.join(map(_srt_block, subtitles.ids[start:end], subtitles.timings[start:end],
+                                     subtitles.translations[start:end])))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        with _atomic_open(self._offset_path, encoding='utf-8') as f:
+            f.write(f"{end} {self._source_digest}")
+    
+    def close(self):
+        self._file.close()
 
 class SubtitleTranslator:
     def __init__(self):
-        self.translator = Translator()
         self.translation_memory = self.load_memory()
+        self._loop = None
+        self._client = None
+        if httpx:
+            # One client and one event loop for the whole session so pooled
+            # connections survive between files
+            self._loop = asyncio.new_event_loop()
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=REQUEST_TIMEOUT,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+            )
+            self._limiter = AsyncLimiter(REQUESTS_PER_SECOND, time_period=1.0)
+        atexit.register(self.close)
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        if self._client is not None:
+            await self._client.aclose()
+    
+    def close(self):
+        """Release the HTTP client, the event loop and the memory database"""
+        if self._client is not None:
+            # A Ctrl-C in run_until_complete leaves tasks behind; cancel them
+            # so they cannot send requests while the client shuts down
+            pending = asyncio.all_tasks(self._loop)
+            if pending:
+                for task in pending:
+                    task.cancel()
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.run_until_complete(self.aclose())
+            self._loop.close()
+            self._client = None
+        self.translation_memory.close()
         
     def load_memory(self):
-        """Load translation memory from file"""
-        try:
-            with open('translation_memory.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+        """Open the translation memory database"""
+        memory = TranslationMemory(MEMORY_DB)
+        # Carry over memories saved in the earlier formats, oldest first so
+        # the log's later entries win
+        for legacy_path in (LEGACY_MEMORY_FILE, LEGACY_MEMORY_LOG):
+            if legacy_path.exists():
+                self._import_legacy_memory(memory, legacy_path)
+        return memory
     
-    def save_memory(self):
-        """Save translation memory to file"""
-        with open('translation_memory.json', 'w', encoding='utf-8') as f:
-            json.dump(self.translation_memory, f, ensure_ascii=False, indent=2)
+    def _import_legacy_memory(self, memory, legacy_path):
+        """Import a .json or .jsonl memory once, then set the file aside"""
+        try:
+            if legacy_path.suffix == '.jsonl':
+                entries = []
+                with open(legacy_path, 'rb') as f:
+                    for line in f:
+                        try:
+                            entry = _loads(line)
+                            entries.append((entry['src'], entry['tgt']))
+                        except (ValueError, KeyError, TypeError):
+                            # Blank lines and a truncated final append
+                            continue
+            else:
+                entries = _loads(legacy_path.read_bytes()).items()
+        except (ValueError, AttributeError) as e:
+            print(f"⚠️  Could not import {legacy_path}: {e}")
+            return
+        
+        memory.update(entries)
+        # Renaming keeps a cleared memory from being refilled on the next start
+        os.replace(legacy_path, legacy_path.with_name(legacy_path.name + '.migrated'))
     
     def parse_srt(self, file_path):
         """Parse SRT file and extract subtitles"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        subtitles = []
-        blocks = content.strip().split('\n\n')
-        
-        for block in blocks:
-            lines = block.strip().split('\n')
-            if len(lines) >= 3:
-                subtitle = {
-                    'id': int(lines[0]),
-                    'timing': lines[1],
-                    'original_text': '\n'.join(lines[2:]),
-                    'translated_text': '',
-                    'needs_review': False
-                }
-                subtitles.append(subtitle)
+        subtitles = SubtitleStore()
+        
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return subtitles
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            # Only one block at a time is copied out of the mapping and decoded
+            start = 0
+            for separator in BLOCK_SEPARATOR_RE.finditer(mm):
+                self._parse_block(subtitles, mm[start:separator.start()])
+                start = separator.end()
+            self._parse_block(subtitles, mm[start:])
+        finally:
+            mm.close()
         
         return subtitles
     
+    def _parse_block(self, subtitles, block):
+        """Add one raw SRT block to subtitles, dropping incomplete blocks"""
+        lines = block.decode('utf-8-sig').strip().splitlines()
+        if len(lines) >= 3:
+            subtitles.append(int(lines[0]), lines[1], '\n'.join(lines[2:]))
+    
+    async def translate_batch(self, client, texts):
+        """Translate a list of English texts to Myanmar in a single request"""
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                async with self._limiter:
+                    response = await client.post(TRANSLATE_URL, params=TRANSLATE_PARAMS, data={'q': texts})
+                if response.status_code != 429 or attempt == MAX_RETRIES:
+                    break
+                await asyncio.sleep(_retry_delay(response, attempt))
+            response.raise_for_status()
+            results = _parse_translations(response.content, texts)
+            
+        except Exception as e:
+            tqdm.write(f"Translation error for batch of {len(texts)} lines: {e}")
+            return [f"{TRANSLATION_ERROR_PREFIX}{text}]" for text in texts]
+        
+        # Save to memory
+        self.translation_memory.update(zip(texts, results))
+        return results
+    
+    def translate_batch_sync(self, texts):
+        """Blocking variant of translate_batch built on urllib"""
+        url = f"{TRANSLATE_URL}?{urllib.parse.urlencode(TRANSLATE_PARAMS)}"
+        body = urllib.parse.urlencode({'q': texts}, doseq=True).encode('utf-8')
+        try:
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    with urllib.request.urlopen(urllib.request.Request(url, data=body),
+                                                timeout=REQUEST_TIMEOUT) as response:
+                        data = response.read()
+                    break
+                except urllib.error.HTTPError as e:
+                    if e.code != 429 or attempt == MAX_RETRIES:
+                        raise
+                    time.sleep(_retry_delay(e, attempt))
+            results = _parse_translations(data, texts)
+            
+        except Exception as e:
+            tqdm.write(f"Translation error for batch of {len(texts)} lines: {e}")
+            return [f"{TRANSLATION_ERROR_PREFIX}{text}]" for text in texts]
+        
+        # Save to memory
+        self.translation_memory.update(zip(texts, results))
+        return results
+    
     def translate_text(self, text):
         """Translate English text to Myanmar using Google Translate"""
-        if not text.strip():
+        if not _needs_translation(text):
             return text
         
         # Check memory first
-        if text in self.translation_memory:
-            return self.translation_memory[text]
+        remembered = self.translation_memory.lookup(text)
+        if remembered is not None:
+            return remembered
+        
+        # Works with either the async client or the urllib fallback
+        if self._client is not None:
+            results = self._loop.run_until_complete(self.translate_batch(self._client, [text]))
+        else:
+            results = self.translate_batch_sync([text])
+        return results[0]
+    
+    async def _translate_concurrently(self, batches, on_batch):
+        """Translate batches concurrently, keeping at most a few requests in flight"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
         
+        async def limited(batch):
+            async with semaphore:
+                return batch, await self.translate_batch(self._client, batch)
+        
+        tasks = [asyncio.ensure_future(limited(batch)) for batch in batches]
         try:
-            # Translate using Google Translate
-            translated = self.translator.translate(text, src='en', dest='my')
-            result = translated.text
-            
-            # Save to memory
-            self.translation_memory[text] = result
-            return result
-            
-        except Exception as e:
-            print(f"Translation error for '{text}': {e}")
-            return f"[Translation Error: {text}]"
+            with tqdm(total=sum(map(len, batches)), unit='line', mininterval=0.1) as progress:
+                for task in asyncio.as_completed(tasks):
+                    batch, translated = await task
+                    on_batch(batch, translated)
+                    progress.set_postfix_str(batch[-1][:30].replace('\n', ' '), refresh=False)
+                    progress.update(len(batch))
+        finally:
+            # Don't leave requests running once the caller has stopped listening
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _translate_threaded(self, batches, on_batch):
+        """Translate batches on a thread pool when the async client is unavailable"""
+        # Each request holds a slot for at least a second, which caps the rate
+        slots = Semaphore(REQUESTS_PER_SECOND)
+        
+        def limited(batch):
+            with slots:
+                started = time.monotonic()
+                translated = self.translate_batch_sync(batch)
+                time.sleep(max(0.0, 1.0 - (time.monotonic() - started)))
+            return translated
+        
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as ex, \
+                tqdm(total=sum(map(len, batches)), unit='line', mininterval=0.1) as progress:
+            # map keeps batch order, so results line up with their inputs
+            for batch, translated in zip(batches, ex.map(limited, batches)):
+                on_batch(batch, translated)
+                progress.set_postfix_str(batch[-1][:30].replace('\n', ' '), refresh=False)
+                progress.update(len(batch))
     
-    def auto_translate_all(self, subtitles):
-        """Auto-translate all subtitles"""
+    def _resume_partial(self, subtitles, output_path, source_digest):
+        """Seed memory with the lines an interrupted run already wrote for output_path"""
+        try:
+            with open(f"{output_path}.offset", encoding='utf-8') as f:
+                offset, previous_digest = f.read().split()
+            offset = int(offset)
+        except (FileNotFoundError, ValueError):
+            return
+        
+        # A partial left behind by a different source file must not be reused
+        if previous_digest != source_digest:
+            return
+        try:
+            previous = self.parse_srt(f"{output_path}.partial")
+        except (FileNotFoundError, ValueError):
+            return
+        
+        count = min(offset, len(previous), len(subtitles))
+        entries = [(subtitles.originals[i], previous.originals[i]) for i in range(count)
+                   if subtitles.translatable[i] and previous.ids[i] == subtitles.ids[i]
+                   and not previous.originals[i].startswith(TRANSLATION_ERROR_PREFIX)]
+        if entries:
+            self.translation_memory.update(entries)
+            print(f"↩️  Resuming: {len(entries)} lines recovered from the previous run")
+    
+    def auto_translate_all(self, subtitles, output_path=None):
+        """Auto-translate all subtitles, streaming finished lines to output_path.partial"""
         print("🔄 Auto-translating all subtitles...")
         
-        for i, subtitle in enumerate(subtitles):
-            # Skip if it's a timing line or number
-            if re.match(r'^\d+$', subtitle['original_text'].strip()):
-                continue
-            if '-->' in subtitle['original_text']:
-                continue
-            
-            print(f"Translating line {i+1}/{len(subtitles)}: {subtitle['original_text'][:50]}...")
-            subtitle['translated_text'] = self.translate_text(subtitle['original_text'])
-            
-            # Small delay to avoid rate limiting
-            time.sleep(0.1)
+        originals = subtitles.originals
+        translations = subtitles.translations
+        translatable = subtitles.translatable
+        
+        if output_path:
+            source_digest = _source_digest(subtitles)
+            self._resume_partial(subtitles, output_path, source_digest)
+        
+        # Request each distinct line once, skipping lines without words
+        # and anything already in memory
+        pending = [text for text in dict.fromkeys(compress(originals, translatable))
+                   if self.translation_memory.lookup(text) is None]
+        print(f"Translating {len(pending)} unique lines for {len(subtitles)} subtitles...")
+        
+        waiting = set(pending)
+        results = {}
+        done = 0
+        partial = _PartialExport(output_path, source_digest) if output_path else None
+        
+        def on_batch(batch, translated):
+            # Fill in every subtitle up to the first one still waiting on a
+            # request, then write that stretch out in order
+            nonlocal done
+            results.update(zip(batch, translated))
+            waiting.difference_update(batch)
+            start = done
+            while done < len(originals) and originals[done] not in waiting:
+                text = originals[done]
+                if not translatable[done]:
+                    translations[done] = text
+                elif text in results:
+                    # Includes error placeholders, which show up in review
+                    translations[done] = results[text]
+                else:
+                    translations[done] = self.translation_memory.lookup(text)
+                done += 1
+            if partial and done > start:
+                partial.write(subtitles, start, done)
+        
+        batches = [pending[start:start + BATCH_SIZE] for start in range(0, len(pending), BATCH_SIZE)]
+        try:
+            # Lines already in memory are ready before any request
+            on_batch([], [])
+            if self._client is not None:
+                self._loop.run_until_complete(self._translate_concurrently(batches, on_batch))
+            else:
+                self._translate_threaded(batches, on_batch)
+        finally:
+            if partial:
+                partial.close()
         
         print("✅ Auto-translation complete!")
         return subtitles
     
     def export_srt(self, subtitles, output_path):
         """Export translated subtitles to SRT file"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for subtitle in subtitles:
-                f.write(f"{subtitle['id']}\n")
-                f.write(f"{subtitle['timing']}\n")
-                f.write(f"{subtitle['translated_text']}\n\n")
+        with _atomic_open(output_path, encoding='utf-8', newline='\n') as f:
+            # One write per chunk of blocks keeps peak memory bounded
+            parts = []
+            append = parts.append
+            for subtitle_id, timing, translated_text in zip(
+                    subtitles.ids, subtitles.timings, subtitles.translations):
+                append(_srt_block(subtitle_id, timing, translated_text))
+                if len(parts) == EXPORT_CHUNK_SIZE:
+                    f.write(''.join(parts))
+                    parts.clear()
+            f.write(''.join(parts))
+        
+        # The finished export supersedes any resume state
+        for suffix in ('.partial', '.offset'):
+            if os.path.exists(output_path + suffix):
+                os.unlink(output_path + suffix)
     
     def interactive_review(self, subtitles):
         """Interactive review and editing interface"""
@@ -107,58 +639,61 @@ class SubtitleTranslator:
         print("🎌 INTERACTIVE REVIEW MODE")
         print("="*50)
         
-        i = 0
-        while i < len(subtitles):
-            sub = subtitles[i]
-            
-            # Skip timing/number lines
-            if re.match(r'^\d+$', sub['original_text'].strip()) or '-->' in sub['original_text']:
-                i += 1
-                continue
-            
-            print(f"\n--- Line {i+1}/{len(subtitles)} ---")
-            print(f"Time: {sub['timing']}")
-            print(f"English: {sub['original_text']}")
-            print(f"Myanmar: {sub['translated_text']}")
-            
-            print("\nOptions:")
-            print("1. ✅ Accept and continue")
-            print("2. ✏️  Edit translation")
-            print("3. ⏭️  Skip to next")
-            print("4. ⏮️  Go back")
-            print("5. 🏁 Finish review")
-            
-            choice = input("\nChoose option (1-5): ").strip()
-            
-            if choice == '1':
-                i += 1
-            elif choice == '2':
-                new_translation = input("Enter new translation: ").strip()
-                if new_translation:
-                    sub['translated_text'] = new_translation
-                    self.translation_memory[sub['original_text']] = new_translation
-                i += 1
-            elif choice == '3':
-                i += 1
-            elif choice == '4':
-                i = max(0, i - 1)
-            elif choice == '5':
-                break
-            else:
-                print("Invalid choice, continuing...")
-                i += 1
+        # Only lines that were sent for translation are reviewed
+        review_idx = list(compress(range(len(subtitles)), subtitles.translatable))
+        # Separate sessions: the single-keystroke menu bindings must not
+        # apply while typing a translation
+        menu_session = PromptSession(key_bindings=_review_key_bindings())
+        edit_session = PromptSession()
+        edits = {}
         
-        self.save_memory()
+        k = 0
+        try:
+            while k < len(review_idx):
+                i = review_idx[k]
+                original_text = subtitles.originals[i]
+                
+                print(f"\n--- Line {i+1}/{len(subtitles)} ---\n"
+                      f"Time: {subtitles.timings[i]}\n"
+                      f"English: {original_text}\n"
+                      f"Myanmar: {subtitles.translations[i]}\n"
+                      f"{REVIEW_OPTIONS}")
+                
+                choice = menu_session.prompt("\nChoose option (1-5): ").strip()
+                
+                if choice == '1':
+                    k += 1
+                elif choice == '2':
+                    new_translation = edit_session.prompt("Enter new translation: ").strip()
+                    if new_translation:
+                        subtitles.translations[i] = new_translation
+                        edits[original_text] = new_translation
+                    k += 1
+                elif choice == '3':
+                    k += 1
+                elif choice == '4':
+                    k = max(0, k - 1)
+                elif choice == '5':
+                    break
+                else:
+                    print("Invalid choice, continuing...")
+                    k += 1
+        except (EOFError, KeyboardInterrupt):
+            print("\nReview stopped.")
+        finally:
+            # Remember all edits in one transaction
+            self.translation_memory.update(edits.items())
     
     def show_statistics(self, subtitles):
         """Show translation statistics"""
-        total_lines = len([s for s in subtitles if not re.match(r'^\d+$', s['original_text'].strip()) and '-->' not in s['original_text'])])
-        translated_lines = len([s for s in subtitles if s['translated_text']])
+        total_lines = sum(subtitles.translatable)
+        translated_lines = sum(map(bool, compress(subtitles.translations, subtitles.translatable)))
+        progress = translated_lines / total_lines * 100 if total_lines else 0.0
         
         print(f"\n📊 Translation Statistics:")
         print(f"Total lines: {total_lines}")
         print(f"Translated lines: {translated_lines}")
-        print(f"Progress: {(translated_lines/total_lines)*100:.1f}%")
+        print(f"Progress: {progress:.1f}%")
         print(f"Memory entries: {len(self.translation_memory)}")
 
 def main():
@@ -173,9 +708,11 @@ def main():
         print("1. 📁 Translate SRT file")
         print("2. 📊 View statistics")
         print("3. 🧹 Clear memory")
-        print("4. 🚪 Exit")
+        print("4. 📤 Export memory to TMX")
+        print("5. 📥 Import memory from TMX")
+        print("6. 🚪 Exit")
         
-        choice = input("\nChoose option (1-4): ").strip()
+        choice = input("\nChoose option (1-6): ").strip()
         
         if choice == '1':
             # File translation workflow
@@ -189,8 +726,13 @@ def main():
             subtitles = translator.parse_srt(file_path)
             print(f"📄 Loaded {len(subtitles)} subtitle blocks")
             
+            # Ask for the output up front so progress is saved next to it
+            output_path = input("Enter output file path (or press Enter for 'translated.srt'): ").strip()
+            if not output_path:
+                output_path = 'translated.srt'
+            
             # Auto-translate
-            subtitles = translator.auto_translate_all(subtitles)
+            subtitles = translator.auto_translate_all(subtitles, output_path)
             
             # Interactive review
             review = input("Start interactive review? (y/n): ").strip().lower()
@@ -198,28 +740,39 @@ def main():
                 translator.interactive_review(subtitles)
             
             # Export
-            output_path = input("Enter output file path (or press Enter for 'translated.srt'): ").strip()
-            if not output_path:
-                output_path = 'translated.srt'
-            
             translator.export_srt(subtitles, output_path)
             print(f"✅ Exported to {output_path}")
             
-            # Save memory
-            translator.save_memory()
-            
         elif choice == '2':
-            translator.show_statistics([])
+            translator.show_statistics(SubtitleStore())
             print(f"Translation memory entries: {len(translator.translation_memory)}")
             
         elif choice == '3':
             confirm = input("Clear all translation memory? (y/n): ").strip().lower()
             if confirm == 'y':
-                translator.translation_memory = {}
-                translator.save_memory()
+                translator.translation_memory.clear()
                 print("✅ Memory cleared!")
                 
         elif choice == '4':
+            tmx_path = input("Enter TMX file path (or press Enter for 'translation_memory.tmx'): ").strip()
+            if not tmx_path:
+                tmx_path = 'translation_memory.tmx'
+            translator.translation_memory.export_tmx(tmx_path)
+            print(f"✅ Exported to {tmx_path}")
+            
+        elif choice == '5':
+            tmx_path = input("Enter TMX file path: ").strip()
+            if not os.path.exists(tmx_path):
+                print("❌ File not found!")
+                continue
+            try:
+                count = translator.translation_memory.import_tmx(tmx_path)
+            except (ElementTree.ParseError, OSError) as e:
+                print(f"❌ Could not read TMX file: {e}")
+                continue
+            print(f"✅ Imported {count} entries")
+            
+        elif choice == '6':
             print("👋 Goodbye!")
             break
         